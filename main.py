@@ -1,96 +1,264 @@
 import os
+import asyncio
+import logging
 from typing import List, Optional, Literal
-from fastapi import FastAPI, HTTPException
+import orjson
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, EmailStr
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import computed_field
 from datetime import datetime, timezone
+from types import MappingProxyType
 
 from database import db, create_document, get_documents
+from schemas import FrozenModel, Customer as CustomerIn, Inventory as InventoryItemIn, OrderRequest as OrderIn, Order
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from aiocache import Cache
+
+logger = logging.getLogger(__name__)
 
 # ---------- Helpers ----------
 
+DATETIME_FIELDS = ("created_at", "updated_at")
+
 def to_str_id(doc: dict) -> dict:
+    # Mutates in place: callers always pass a freshly fetched document
     if not doc:
         return doc
-    d = doc.copy()
-    if "_id" in d:
-        d["id"] = str(d.pop("_id"))
-    # convert datetime to iso
-    for k, v in list(d.items()):
-        if isinstance(v, datetime):
-            d[k] = v.isoformat()
-    return d
+    if "_id" in doc:
+        doc["id"] = str(doc.pop("_id"))
+    # convert known datetime fields to iso at Mongo's millisecond precision,
+    # so freshly written and re-read documents render identically
+    for k in DATETIME_FIELDS:
+        v = doc.get(k)
+        if v is not None and not isinstance(v, str):
+            doc[k] = v.isoformat(timespec="milliseconds")
+    return doc
+
+def price_cents(doc: dict, cents_field: str, dollars_field: str) -> Optional[int]:
+    # Documents not yet converted by migrate_prices.py only carry the dollar
+    # field; fall back to it, and never treat a missing price as zero
+    if doc.get(cents_field) is not None:
+        return int(doc[cents_field])
+    if doc.get(dollars_field) is not None:
+        return round(float(doc[dollars_field]) * 100)
+    return None
+
+def with_dollars(doc: dict, cents_field: str, dollars_field: str) -> dict:
+    cents = price_cents(doc, cents_field, dollars_field)
+    doc[cents_field] = cents
+    doc[dollars_field] = None if cents is None else cents / 100
+    return doc
+
+def order_to_out(doc: dict) -> dict:
+    # Raw counterpart of OrderOut for endpoints that skip model validation
+    return with_dollars(to_str_id(doc), "total_price_nzd_cents", "total_price_nzd")
+
+def inventory_to_out(doc: dict) -> dict:
+    # Raw counterpart of InventoryItemOut for endpoints that skip model validation
+    return with_dollars(to_str_id(doc), "price_per_kg_cents", "price_per_kg")
+
+def parse_oid(value: str, name: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except InvalidId:
+        raise HTTPException(400, f"Invalid {name} id")
+
+def orjson_default(obj):
+    # Datetimes are formatted by to_str_id; ObjectId is the only Mongo type left
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def dump_json(content) -> bytes:
+    return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+class MongoJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return dump_json(content)
+
+# Default inventory for both products, shared by startup seeding and /seed
+INVENTORY_DEFAULTS = (
+    MappingProxyType({
+        "product": "suxhuk",
+        "price_per_kg_cents": 5000,
+        "min_kg": 1,
+        "step_kg": 1,
+        "available_kg": 0,
+        "batch_threshold_kg": 15,
+    }),
+    MappingProxyType({
+        "product": "mish_te_teren",
+        "price_per_kg_cents": 6500,
+        "min_kg": 3,
+        "step_kg": 1,
+        "available_kg": 0,
+        "batch_threshold_kg": 15,
+    }),
+)
+
+# ---------- Response cache ----------
+
+# In-process cache of serialized list responses; each worker holds its own copy
+LIST_CACHE_TTL = int(os.getenv("LIST_CACHE_TTL", 30))
+list_cache = Cache(Cache.MEMORY)
+
+async def cached_list(key: str, load) -> bytes:
+    # Writes bump the key's version before deleting it. If the version moved
+    # while we were loading, the body may predate that write, so drop it again.
+    if LIST_CACHE_TTL <= 0:
+        # aiocache treats ttl=0 as "never expire"; a non-positive TTL disables caching
+        return await load()
+    body = await list_cache.get(key)
+    if body is None:
+        version = await list_cache.get(f"{key}:version")
+        body = await load()
+        await list_cache.set(key, body, ttl=LIST_CACHE_TTL)
+        if await list_cache.get(f"{key}:version") != version:
+            await list_cache.delete(key)
+    return body
+
+async def invalidate_list(key: str):
+    await list_cache.increment(f"{key}:version")
+    await list_cache.delete(key)
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
 
 # ---------- App ----------
 
-app = FastAPI(title="Suxhuk Ordering API")
+app = FastAPI(title="Suxhuk Ordering API", default_response_class=MongoJSONResponse)
+
+# Comma-separated list; credentials are only enabled for explicit origins since
+# a wildcard with credentials makes Starlette echo the origin on every response
+cors_origins = [o.strip() for o in os.getenv("CORS_ALLOW_ORIGINS", "*").split(",") if o.strip()]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=cors_origins,
+    allow_credentials="*" not in cors_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# ---------- Models ----------
-
-class PaymentMethod(BaseModel):
-    label: str
-    brand: Optional[str] = None
-    last4: Optional[str] = None
-    details: Optional[dict] = None
+# List payloads repeat the same keys and compress well; small replies are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=4)
 
-class CustomerIn(BaseModel):
-    name: str
-    email: EmailStr
-    phone: Optional[str] = None
-    address: Optional[str] = None
-    payment_methods: List[PaymentMethod] = Field(default_factory=list)
+# ---------- Models ----------
 
 class CustomerOut(CustomerIn):
     id: str
 
-class InventoryItemIn(BaseModel):
-    product: Literal["suxhuk", "mish_te_teren"]
-    price_per_kg: float = Field(..., ge=0)
-    min_kg: int = Field(..., ge=1)
-    step_kg: int = Field(1, ge=1)
-    available_kg: float = 0
-    batch_threshold_kg: int = Field(15, ge=1)
-
 class InventoryItemOut(InventoryItemIn):
     id: str
 
-class OrderIn(BaseModel):
-    customer_id: str
-    product: Literal["suxhuk", "mish_te_teren"]
-    quantity_kg: int = Field(..., ge=1)
-    notes: Optional[str] = None
+    @computed_field
+    @property
+    def price_per_kg(self) -> float:
+        return self.price_per_kg_cents / 100
 
-class OrderStatusUpdate(BaseModel):
+class OrderStatusUpdate(FrozenModel):
     status: Literal["received", "in_production", "ready_for_collection"]
 
-class OrderOut(BaseModel):
+class OrderOut(Order):
     id: str
-    customer_id: str
-    product: str
-    quantity_kg: int
-    total_price_nzd: float
-    status: str
     created_at: str
-    notes: Optional[str] = None
-    batch_index: Optional[int] = None
+
+    @computed_field
+    @property
+    def total_price_nzd(self) -> float:
+        return self.total_price_nzd_cents / 100
+
+# Only fetch the fields the read endpoints return (_id is included by default)
+def projection_for(model) -> dict:
+    return {name: 1 for name in model.model_fields if name != "id"}
+
+CUSTOMER_PROJECTION = projection_for(CustomerOut)
+# Legacy dollar fields are fetched too until migrate_prices.py has run
+INVENTORY_PROJECTION = {**projection_for(InventoryItemOut), "price_per_kg": 1}
+ORDER_PROJECTION = {**projection_for(OrderOut), "total_price_nzd": 1}
+
+# ---------- Startup ----------
+
+# Database setup runs as a background task: an unreachable Mongo would
+# otherwise hold up boot for the server selection timeout of every call.
+# Failures are logged rather than raised, so /test can report the problem.
+
+async def create_indexes():
+    # Unique keys back the upserts; order index serves per-customer listings
+    # Failures (e.g. existing duplicate emails) are logged, not raised
+    results = await asyncio.gather(
+        db["customer"].create_index("email", unique=True),
+        db["inventory"].create_index("product", unique=True),
+        db["order"].create_index([("customer_id", 1), ("created_at", -1)]),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Index creation failed: %s", result)
+
+async def seed_inventory_on_startup():
+    # Ensure we always have entries for both products with defaults
+    now = datetime.now(timezone.utc)
+    try:
+        await db["inventory"].bulk_write([
+            UpdateOne(
+                {"product": item["product"]},
+                {"$setOnInsert": {**item, "created_at": now, "updated_at": now}},
+                upsert=True,
+            )
+            for item in INVENTORY_DEFAULTS
+        ])
+    except Exception as e:
+        logger.warning("Inventory seeding failed: %s", e)
+        return
+    await invalidate_list("list_inventory")
+
+async def prime_collection_names():
+    try:
+        await collection_names(refresh=True)
+    except Exception as e:
+        # Nothing is cached, so /test re-queries and reports the error
+        logger.warning("Listing collections failed: %s", e)
+
+async def prepare_database():
+    await create_indexes()
+    await seed_inventory_on_startup()
+    await prime_collection_names()
+
+startup_tasks = set()
+
+@app.on_event("startup")
+async def start_database_setup():
+    if db is None:
+        return
+    # Keep a reference so the task isn't garbage collected mid-run
+    task = asyncio.create_task(prepare_database())
+    startup_tasks.add(task)
+    task.add_done_callback(startup_tasks.discard)
 
 # ---------- Root & Health ----------
 
+# Collections rarely change, so health probes read a cached listing
+COLLECTIONS_CACHE_TTL = int(os.getenv("COLLECTIONS_CACHE_TTL", 60))
+
+async def collection_names(refresh: bool = False) -> List[str]:
+    names = None if refresh else await list_cache.get("collection_names")
+    if names is None:
+        names = await db.list_collection_names()
+        await list_cache.set("collection_names", names, ttl=COLLECTIONS_CACHE_TTL)
+    return names
+
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Suxhuk Ordering API running"}
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -106,7 +274,7 @@ def test_database():
             response["database_name"] = db.name
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -117,133 +285,132 @@ def test_database():
         response["database"] = f"❌ Error: {str(e)[:50]}"
     return response
 
+@app.get("/test/refresh")
+async def refresh_test_database():
+    if db is not None:
+        try:
+            await collection_names(refresh=True)
+        except Exception:
+            # Drop the stale listing so test_database re-queries and reports the error
+            await list_cache.delete("collection_names")
+    return await test_database()
+
 # ---------- Customers ----------
 
+# Read endpoints return stored documents as-is (they were validated on write).
+# They return a Response directly, so FastAPI skips response_model at runtime and
+# only uses it to document the serialized shape, computed dollar fields included.
+
 @app.get("/customers", response_model=List[CustomerOut])
-def list_customers():
-    docs = get_documents("customer")
-    return [CustomerOut(**to_str_id(d)) for d in docs]
+async def list_customers():
+    async def load() -> bytes:
+        docs = await get_documents("customer", projection=CUSTOMER_PROJECTION)
+        return dump_json([to_str_id(d) for d in docs])
+    return json_response(await cached_list("list_customers", load))
 
 @app.post("/customers", response_model=CustomerOut)
-def upsert_customer(data: CustomerIn):
+async def upsert_customer(data: CustomerIn):
     # Upsert by email
-    existing = db["customer"].find_one({"email": data.email})
     now = datetime.now(timezone.utc)
     payload = data.model_dump()
-    payload.update({"updated_at": now, "created_at": existing.get("created_at") if existing else now})
-    if existing:
-        db["customer"].update_one({"_id": existing["_id"]}, {"$set": payload})
-        doc = db["customer"].find_one({"_id": existing["_id"]})
-    else:
-        new_id = create_document("customer", payload)
-        doc = db["customer"].find_one({"_id": ObjectId(new_id)})
-    return CustomerOut(**to_str_id(doc))
+    payload["updated_at"] = now
+    doc = await db["customer"].find_one_and_update(
+        {"email": data.email},
+        {"$set": payload, "$setOnInsert": {"created_at": now}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    await invalidate_list("list_customers")
+    return CustomerOut.model_validate(to_str_id(doc))
 
 @app.get("/customers/{customer_id}", response_model=CustomerOut)
-def get_customer(customer_id: str):
-    try:
-        doc = db["customer"].find_one({"_id": ObjectId(customer_id)})
-    except Exception:
-        raise HTTPException(400, "Invalid customer id")
+async def get_customer(customer_id: str):
+    doc = await db["customer"].find_one({"_id": parse_oid(customer_id, "customer")}, CUSTOMER_PROJECTION)
     if not doc:
         raise HTTPException(404, "Customer not found")
-    return CustomerOut(**to_str_id(doc))
+    return MongoJSONResponse(to_str_id(doc))
 
 @app.put("/customers/{customer_id}", response_model=CustomerOut)
-def update_customer(customer_id: str, data: CustomerIn):
-    try:
-        oid = ObjectId(customer_id)
-    except Exception:
-        raise HTTPException(400, "Invalid customer id")
+async def update_customer(customer_id: str, data: CustomerIn):
+    oid = parse_oid(customer_id, "customer")
     payload = data.model_dump()
     payload["updated_at"] = datetime.now(timezone.utc)
-    res = db["customer"].update_one({"_id": oid}, {"$set": payload})
-    if res.matched_count == 0:
+    try:
+        doc = await db["customer"].find_one_and_update(
+            {"_id": oid}, {"$set": payload}, return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raise HTTPException(409, "Email already belongs to another customer")
+    if not doc:
         raise HTTPException(404, "Customer not found")
-    doc = db["customer"].find_one({"_id": oid})
-    return CustomerOut(**to_str_id(doc))
+    await invalidate_list("list_customers")
+    return CustomerOut.model_validate(to_str_id(doc))
 
 # ---------- Inventory ----------
 
 @app.get("/inventory", response_model=List[InventoryItemOut])
-def list_inventory():
-    docs = get_documents("inventory")
-    # Ensure we always have entries for both products with defaults
-    existing_products = {d.get("product") for d in docs}
-    defaults = []
-    if "suxhuk" not in existing_products:
-        defaults.append({
-            "product": "suxhuk",
-            "price_per_kg": 50.0,
-            "min_kg": 1,
-            "step_kg": 1,
-            "available_kg": 0,
-            "batch_threshold_kg": 15,
-        })
-    if "mish_te_teren" not in existing_products:
-        defaults.append({
-            "product": "mish_te_teren",
-            "price_per_kg": 65.0,
-            "min_kg": 3,
-            "step_kg": 1,
-            "available_kg": 0,
-            "batch_threshold_kg": 15,
-        })
-    for item in defaults:
-        create_document("inventory", item)
-    docs = get_documents("inventory")
-    return [InventoryItemOut(**to_str_id(d)) for d in docs]
+async def list_inventory():
+    async def load() -> bytes:
+        docs = await get_documents("inventory", projection=INVENTORY_PROJECTION)
+        return dump_json([inventory_to_out(d) for d in docs])
+    return json_response(await cached_list("list_inventory", load))
 
 @app.post("/inventory", response_model=InventoryItemOut)
-def create_or_update_inventory(item: InventoryItemIn):
-    existing = db["inventory"].find_one({"product": item.product})
+async def create_or_update_inventory(item: InventoryItemIn):
+    now = datetime.now(timezone.utc)
     payload = item.model_dump()
-    payload["updated_at"] = datetime.now(timezone.utc)
-    if existing:
-        db["inventory"].update_one({"_id": existing["_id"]}, {"$set": payload})
-        doc = db["inventory"].find_one({"_id": existing["_id"]})
-    else:
-        new_id = create_document("inventory", payload)
-        doc = db["inventory"].find_one({"_id": ObjectId(new_id)})
-    return InventoryItemOut(**to_str_id(doc))
+    payload["updated_at"] = now
+    doc = await db["inventory"].find_one_and_update(
+        {"product": item.product},
+        {"$set": payload, "$setOnInsert": {"created_at": now}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    await invalidate_list("list_inventory")
+    return InventoryItemOut.model_validate(to_str_id(doc))
 
 @app.put("/inventory/{product}", response_model=InventoryItemOut)
-def update_inventory(product: str, item: InventoryItemIn):
+async def update_inventory(product: str, item: InventoryItemIn):
     if item.product != product:
         raise HTTPException(400, "Product path and body mismatch")
-    existing = db["inventory"].find_one({"product": product})
-    if not existing:
-        raise HTTPException(404, "Inventory item not found")
     payload = item.model_dump()
     payload["updated_at"] = datetime.now(timezone.utc)
-    db["inventory"].update_one({"_id": existing["_id"]}, {"$set": payload})
-    doc = db["inventory"].find_one({"_id": existing["_id"]})
-    return InventoryItemOut(**to_str_id(doc))
+    doc = await db["inventory"].find_one_and_update(
+        {"product": product}, {"$set": payload}, return_document=ReturnDocument.AFTER
+    )
+    if not doc:
+        raise HTTPException(404, "Inventory item not found")
+    await invalidate_list("list_inventory")
+    return InventoryItemOut.model_validate(to_str_id(doc))
 
 # ---------- Orders ----------
 
 @app.get("/orders", response_model=List[OrderOut])
-def list_orders():
-    docs = get_documents("order")
-    out = []
-    for d in docs:
-        d = to_str_id(d)
-        d["created_at"] = d.get("created_at", datetime.now(timezone.utc)).isoformat() if isinstance(d.get("created_at"), datetime) else d.get("created_at")
-        out.append(OrderOut(**d))
-    return out
+async def list_orders():
+    # Stream the cursor batch by batch so memory stays flat for large histories
+    cursor = db["order"].find({}, ORDER_PROJECTION).batch_size(200)
+
+    async def body():
+        yield b"["
+        first = True
+        async for d in cursor:
+            chunk = dump_json(order_to_out(d))
+            yield chunk if first else b"," + chunk
+            first = False
+        yield b"]"
+    return StreamingResponse(body(), media_type="application/json")
 
 @app.post("/orders", response_model=OrderOut)
-def create_order(order: OrderIn):
-    # Validate customer exists
-    try:
-        cust = db["customer"].find_one({"_id": ObjectId(order.customer_id)})
-    except Exception:
-        raise HTTPException(400, "Invalid customer id")
-    if not cust:
+async def create_order(order: OrderIn):
+    customer_oid = parse_oid(order.customer_id, "customer")
+
+    # Validate customer exists and load inventory item concurrently
+    cust_exists, inv = await asyncio.gather(
+        db["customer"].count_documents({"_id": customer_oid}, limit=1),
+        db["inventory"].find_one({"product": order.product}),
+    )
+    if not cust_exists:
         raise HTTPException(404, "Customer not found")
-
-    # Load inventory item
-    inv = db["inventory"].find_one({"product": order.product})
     if not inv:
         raise HTTPException(400, "Inventory for product not configured yet")
 
@@ -254,82 +421,86 @@ def create_order(order: OrderIn):
     if order.quantity_kg % step != 0:
         raise HTTPException(400, f"Quantity must be in increments of {step} kg")
 
-    # Calculate total and batch index based on deficit
-    price_per_kg = float(inv.get("price_per_kg", 0))
-    total = round(price_per_kg * order.quantity_kg, 2)
-
-    new_available = float(inv.get("available_kg", 0)) - order.quantity_kg
-    deficit = abs(new_available) if new_available < 0 else 0
-    threshold = int(inv.get("batch_threshold_kg", 15))
-    batch_index = (deficit - 1) // threshold if deficit > 0 else 0
-
-    order_doc = {
-        "customer_id": order.customer_id,
-        "product": order.product,
-        "quantity_kg": int(order.quantity_kg),
-        "total_price_nzd": total,
-        "status": "received",
-        "notes": order.notes,
-        "batch_index": int(batch_index),
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
-    }
-    new_id = create_document("order", order_doc)
+    # Calculate total in cents so money math stays exact
+    price_per_kg_cents = price_cents(inv, "price_per_kg_cents", "price_per_kg")
+    if price_per_kg_cents is None:
+        raise HTTPException(409, "Inventory price for product not configured")
+    total_cents = price_per_kg_cents * order.quantity_kg
 
-    # Update inventory available kg
-    db["inventory"].update_one({"_id": inv["_id"]}, {"$set": {"available_kg": new_available, "updated_at": datetime.now(timezone.utc)}})
+    # Decrement inventory and insert the order in one transaction. The batch
+    # index comes from the post-decrement stock, so concurrent orders never
+    # compute their deficit from the same available_kg. with_transaction
+    # retries the callback when concurrent orders hit a write conflict.
+    now = datetime.now(timezone.utc)
 
-    saved = db["order"].find_one({"_id": ObjectId(new_id)})
-    saved = to_str_id(saved)
-    saved["created_at"] = saved.get("created_at").isoformat()
-    return OrderOut(**saved)
+    async def place_order(session) -> dict:
+        updated = await db["inventory"].find_one_and_update(
+            {"_id": inv["_id"]},
+            {"$inc": {"available_kg": -order.quantity_kg}, "$set": {"updated_at": now}},
+            return_document=ReturnDocument.AFTER,
+            session=session,
+        )
+        if not updated:
+            raise HTTPException(400, "Inventory for product not configured yet")
+
+        new_available = float(updated.get("available_kg", 0))
+        deficit = abs(new_available) if new_available < 0 else 0
+        threshold = int(updated.get("batch_threshold_kg", 15))
+        batch_index = (deficit - 1) // threshold if deficit > 0 else 0
+
+        order_doc = {
+            "customer_id": order.customer_id,
+            "product": order.product,
+            "quantity_kg": int(order.quantity_kg),
+            "total_price_nzd_cents": total_cents,
+            "status": "received",
+            "notes": order.notes,
+            "batch_index": int(batch_index),
+            "created_at": now,
+            "updated_at": now,
+        }
+        order_doc["_id"] = await create_document("order", order_doc, session=session)
+        return order_doc
+
+    async with await db.client.start_session() as session:
+        order_doc = await session.with_transaction(place_order)
+    await invalidate_list("list_inventory")
+
+    return OrderOut.model_validate(to_str_id(order_doc))
 
 @app.patch("/orders/{order_id}/status", response_model=OrderOut)
-def update_order_status(order_id: str, body: OrderStatusUpdate):
-    try:
-        oid = ObjectId(order_id)
-    except Exception:
-        raise HTTPException(400, "Invalid order id")
-    res = db["order"].update_one({"_id": oid}, {"$set": {"status": body.status, "updated_at": datetime.now(timezone.utc)}})
-    if res.matched_count == 0:
+async def update_order_status(order_id: str, body: OrderStatusUpdate):
+    oid = parse_oid(order_id, "order")
+    doc = await db["order"].find_one_and_update(
+        {"_id": oid},
+        {"$set": {"status": body.status, "updated_at": datetime.now(timezone.utc)}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not doc:
         raise HTTPException(404, "Order not found")
-    doc = db["order"].find_one({"_id": oid})
-    out = to_str_id(doc)
-    if isinstance(out.get("created_at"), datetime):
-        out["created_at"] = out["created_at"].isoformat()
-    return OrderOut(**out)
+    return OrderOut.model_validate(order_to_out(doc))
 
 # Simple helper to clear and seed inventory (optional for quick start)
 @app.post("/seed")
-def seed_defaults():
+async def seed_defaults():
     # Ensure suxhuk and mish_te_teren with default prices and mins
-    defaults = [
-        {
-            "product": "suxhuk",
-            "price_per_kg": 50.0,
-            "min_kg": 1,
-            "step_kg": 1,
-            "available_kg": 0,
-            "batch_threshold_kg": 15,
-        },
-        {
-            "product": "mish_te_teren",
-            "price_per_kg": 65.0,
-            "min_kg": 3,
-            "step_kg": 1,
-            "available_kg": 0,
-            "batch_threshold_kg": 15,
-        },
-    ]
-    for item in defaults:
-        existing = db["inventory"].find_one({"product": item["product"]})
-        if existing:
-            db["inventory"].update_one({"_id": existing["_id"]}, {"$set": item})
-        else:
-            create_document("inventory", item)
+    now = datetime.now(timezone.utc)
+    await db["inventory"].bulk_write([
+        UpdateOne(
+            {"product": item["product"]},
+            {"$set": {**item, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+            upsert=True,
+        )
+        for item in INVENTORY_DEFAULTS
+    ], ordered=False)
+    await invalidate_list("list_inventory")
     return {"status": "ok"}
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Defaults to one worker: the list cache is per process, so extra workers
+    # would keep serving stale lists after another worker's write until the TTL
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+    # Workers need an import string; each one gets its own Mongo pool (DATABASE_MAX_POOL_SIZE)
+    uvicorn.run("main:app", host="0.0.0.0", port=port, loop="uvloop", http="httptools", workers=workers)
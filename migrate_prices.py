@@ -0,0 +1,33 @@
+"""
+One-off migration: store prices as integer NZD cents
+
+Converts inventory `price_per_kg` and order `total_price_nzd` (float dollars)
+to `price_per_kg_cents` / `total_price_nzd_cents` and removes the old fields.
+Safe to re-run; documents that were already converted are not matched.
+
+    python migrate_prices.py
+"""
+
+import asyncio
+
+from database import db
+
+def to_cents(field: str) -> dict:
+    return {"$toInt": {"$round": [{"$multiply": [f"${field}", 100]}, 0]}}
+
+async def migrate():
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    inventory = await db["inventory"].update_many(
+        {"price_per_kg": {"$exists": True}},
+        [{"$set": {"price_per_kg_cents": to_cents("price_per_kg")}}, {"$unset": "price_per_kg"}],
+    )
+    orders = await db["order"].update_many(
+        {"total_price_nzd": {"$exists": True}},
+        [{"$set": {"total_price_nzd_cents": to_cents("total_price_nzd")}}, {"$unset": "total_price_nzd"}],
+    )
+    print(f"Converted {inventory.modified_count} inventory items and {orders.modified_count} orders")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -2,44 +2,63 @@
 Database Schemas for Suxhuk Ordering App
 
 Each Pydantic model represents a MongoDB collection. The collection name is the
-lowercase of the class name by default.
+lowercase of the class name by default. The API in main.py imports these
+directly, so each collection's validator is built once.
 """
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List, Literal
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, model_validator
+from typing import Annotated, Optional, List, Literal
 from datetime import datetime
 
+# Cheap structural check instead of EmailStr, which pulls in email-validator
+Email = Annotated[str, StringConstraints(pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$")]
+
+class FrozenModel(BaseModel):
+    # Build validators at import and skip __setattr__ bookkeeping; models are never mutated
+    model_config = ConfigDict(frozen=True, defer_build=False)
+
 # ----------------------------
 # Core domain schemas
 # ----------------------------
 
-class PaymentMethod(BaseModel):
+class PaymentMethod(FrozenModel):
     label: str = Field(..., description="Friendly name, e.g., Visa ending 1234")
     brand: Optional[str] = Field(None, description="Card brand or type")
     last4: Optional[str] = Field(None, description="Last 4 digits if card")
     details: Optional[dict] = Field(default=None, description="Gateway-specific metadata")
 
-class Customer(BaseModel):
+class Customer(FrozenModel):
     name: str
-    email: EmailStr
+    email: Email
     phone: Optional[str] = None
     address: Optional[str] = None
     payment_methods: List[PaymentMethod] = Field(default_factory=list)
-    created_at: Optional[datetime] = None
 
-class Inventory(BaseModel):
+class Inventory(FrozenModel):
     product: Literal["suxhuk", "mish_te_teren"]
-    price_per_kg: float = Field(..., ge=0)
+    price_per_kg_cents: int = Field(..., ge=0, strict=True, description="Price per kg in NZD cents")
     min_kg: int = Field(..., ge=1, description="Minimum kg per order")
     step_kg: int = Field(1, ge=1, description="Order increment in kg")
     available_kg: float = Field(0, description="Can go negative for preorder")
     batch_threshold_kg: int = Field(15, ge=1, description="When deficit hits this, start a new batch")
 
-class Order(BaseModel):
+    @model_validator(mode="before")
+    @classmethod
+    def dollars_to_cents(cls, data):
+        # Clients written before the switch to cents still send price_per_kg in dollars
+        if isinstance(data, dict) and data.get("price_per_kg_cents") is None:
+            dollars = data.get("price_per_kg")
+            if isinstance(dollars, (int, float)) and not isinstance(dollars, bool):
+                data = {**data, "price_per_kg_cents": round(dollars * 100)}
+        return data
+
+class OrderRequest(FrozenModel):
     customer_id: str
     product: Literal["suxhuk", "mish_te_teren"]
-    quantity_kg: int = Field(..., ge=1)
-    total_price_nzd: float
-    status: Literal["received", "in_production", "ready_for_collection"] = "received"
+    quantity_kg: int = Field(..., ge=1, strict=True)
     notes: Optional[str] = None
+
+class Order(OrderRequest):
+    total_price_nzd_cents: int = Field(..., description="Order total in NZD cents")
+    status: Literal["received", "in_production", "ready_for_collection"] = "received"
     created_at: Optional[datetime] = None
     batch_index: Optional[int] = Field(None, description="Optional grouping by 15kg batches")